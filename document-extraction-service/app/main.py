@@ -1,19 +1,24 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 import pytesseract
-from PIL import Image
-import pdf2image
+import asyncio
 import io
 import os
 import logging
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple, Union
 import tempfile
 import shutil
 from pathlib import Path
 
+import aiofiles
+import orjson
+from blake3 import blake3
+
 # Import our OCR service
-from .services.ocr import extract_text_from_image_bytes, extract_text_from_pdf_bytes
+from .services import cache as ocr_cache
+from .services.ocr import DEFAULT_DPI, DEFAULT_MODEL_QUALITY, DEFAULT_PSM, TESSDATA_DIRS, extract_text_from_image_path, extract_text_from_image_path_checked, extract_text_from_pdf_path, extract_text_from_pdf_path_checked
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,7 +28,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Tammat Document Extraction Service",
     description="AI-powered document text extraction using OCR",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -65,54 +71,17 @@ SUPPORTED_IMAGE_TYPES = {".png", ".jpg", ".jpeg", ".bmp", ".tiff", ".webp"}
 SUPPORTED_PDF_TYPES = {".pdf"}
 SUPPORTED_TYPES = SUPPORTED_IMAGE_TYPES | SUPPORTED_PDF_TYPES
 
-def extract_text_from_image(image: Image.Image) -> str:
-    """Extract text from PIL Image using Tesseract OCR"""
-    try:
-        # Configure Tesseract for better accuracy
-        custom_config = r'--oem 3 --psm 6 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789.,;:!?@#$%&*()_+-=[]{}|"\':<>?/\\ '
-        
-        # Extract text with custom configuration
-        text = pytesseract.image_to_string(image, config=custom_config)
-        
-        # Clean up extracted text
-        text = text.strip()
-        text = ' '.join(text.split())  # Remove extra whitespace
-        
-        return text
-    except Exception as e:
-        logger.error(f"Error extracting text from image: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to extract text from image: {str(e)}")
+# Uploads are streamed to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1MB
 
-def extract_text_from_pdf(pdf_bytes: bytes) -> str:
-    """Extract text from PDF by converting pages to images and running OCR"""
-    try:
-        # Convert PDF to images
-        images = pdf2image.convert_from_bytes(
-            pdf_bytes,
-            dpi=300,  # Higher DPI for better OCR accuracy
-            fmt='PNG',
-            thread_count=4  # Use multiple threads for faster processing
-        )
-        
-        extracted_texts = []
-        
-        for i, image in enumerate(images):
-            logger.info(f"Processing PDF page {i + 1}/{len(images)}")
-            
-            # Extract text from each page
-            page_text = extract_text_from_image(image)
-            
-            if page_text:
-                extracted_texts.append(f"--- Page {i + 1} ---\n{page_text}")
-        
-        # Combine all extracted text
-        full_text = "\n\n".join(extracted_texts)
-        
-        return full_text
-        
-    except Exception as e:
-        logger.error(f"Error processing PDF: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to process PDF: {str(e)}")
+# Files in a batch are OCR'd concurrently. Threads are enough: the heavy work
+# runs outside the GIL (tesserocr, tesseract subprocesses, the page process pool)
+BATCH_SIZE_LIMIT = 10
+_BATCH_EXECUTOR = ThreadPoolExecutor(max_workers=BATCH_SIZE_LIMIT)
+
+# Single-file OCR runs off the event loop too, on its own threads so a full
+# batch cannot queue /extract-text behind it
+_EXTRACT_EXECUTOR = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
 
 def validate_file_type(filename: str) -> str:
     """Validate file type and return the type category"""
@@ -132,6 +101,73 @@ def validate_file_type(filename: str) -> str:
             detail=f"Unsupported file type. Supported types: {', '.join(SUPPORTED_TYPES)}"
         )
 
+async def spool_upload(file: UploadFile) -> Tuple[str, int, str]:
+    """Stream an upload to a temporary file without buffering it in memory.
+    Returns the temp file path (caller removes it), the number of bytes written
+    and the BLAKE3 hex digest of the content."""
+    fd, path = tempfile.mkstemp(suffix=Path(file.filename).suffix.lower())
+    os.close(fd)
+    
+    size = 0
+    hasher = blake3()
+    try:
+        async with aiofiles.open(path, "wb") as out:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                hasher.update(chunk)
+                await out.write(chunk)
+    except Exception:
+        os.unlink(path)
+        raise
+    
+    return path, size, hasher.hexdigest()
+
+def extract_text_from_file(file_path: str, file_type: str, language: str) -> str:
+    """Run OCR on a spooled upload; blocking, so call it from an executor"""
+    if file_type == "image":
+        return extract_text_from_image_path(file_path, language)
+    
+    page_texts = extract_text_from_pdf_path(file_path, language)
+    return "\n\n".join([f"--- Page {i+1} ---\n{page_text}" for i, page_text in enumerate(page_texts)])
+
+async def spool_batch_file(file: UploadFile) -> Tuple[str, str]:
+    """Validate and spool one file of a batch request, returning (file_type, path)"""
+    file_type = validate_file_type(file.filename)
+    file_path, _, _ = await spool_upload(file)
+    return file_type, file_path
+
+async def process_batch_file(filename: str, spooled: Union[Tuple[str, str], Exception], language: str) -> dict:
+    """OCR one spooled file of a batch request, returning its result entry"""
+    file_path = None
+    try:
+        if isinstance(spooled, Exception):
+            raise spooled
+        file_type, file_path = spooled
+        
+        loop = asyncio.get_running_loop()
+        text = await loop.run_in_executor(_BATCH_EXECUTOR, extract_text_from_file, file_path, file_type, language)
+        
+        return {
+            "filename": filename,
+            "file_type": file_type,
+            "text": text,
+            "status": "success",
+            "text_length": len(text)
+        }
+        
+    except Exception as e:
+        logger.error(f"Error processing {filename}: {str(e)}")
+        return {
+            "filename": filename,
+            "file_type": "unknown",
+            "text": "",
+            "status": "error",
+            "error": str(e)
+        }
+    finally:
+        if file_path:
+            os.unlink(file_path)
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -165,7 +201,9 @@ async def health_check():
 async def extract_text(
     file: UploadFile = File(...),
     language: Optional[str] = Form("eng"),
-    dpi: Optional[int] = Form(300)
+    dpi: Optional[int] = Form(DEFAULT_DPI),
+    psm: Optional[int] = Form(DEFAULT_PSM),
+    model_quality: Optional[str] = Form(DEFAULT_MODEL_QUALITY)
 ):
     """
     Extract text from uploaded document (PDF or Image)
@@ -173,29 +211,61 @@ async def extract_text(
     Args:
         file: Uploaded file (PDF or Image)
         language: OCR language (default: eng)
-        dpi: DPI for PDF conversion (default: 300)
+        dpi: DPI for rasterising scanned PDF pages (default: 200, retried at 300 if no text is found)
+        psm: Tesseract page segmentation mode (default: 6, single text block; use 3 for complex layouts)
+        model_quality: Tesseract model set, "fast" (int8, default) or "best" (float, slower)
     
     Returns:
         JSON with extracted text
     """
+    file_path = None
     try:
         logger.info(f"Processing file: {file.filename} ({file.content_type})")
         
         # Validate file type
         file_type = validate_file_type(file.filename)
         
-        # Read file content
-        file_content = await file.read()
+        if not 0 <= psm <= 13:
+            raise HTTPException(
+                status_code=400,
+                detail="Unsupported page segmentation mode. Supported: 0-13"
+            )
+        
+        if model_quality not in TESSDATA_DIRS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported model quality. Supported: {', '.join(TESSDATA_DIRS)}"
+            )
+        
+        # Only the default set may fall back to Tesseract's own TESSDATA_PREFIX;
+        # "best" without its directory would silently run the fast models
+        if model_quality != DEFAULT_MODEL_QUALITY and not TESSDATA_DIRS[model_quality]:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Model quality '{model_quality}' is not available on this server"
+            )
+        
+        # Stream file content to disk
+        file_path, file_size, digest = await spool_upload(file)
         
-        if not file_content:
+        if not file_size:
             raise HTTPException(status_code=400, detail="Empty file")
         
-        extracted_text = ""
+        cache_key = ocr_cache.make_key(digest, language, dpi, psm, model_quality)
+        extracted_text = ocr_cache.get(cache_key)
+        complete = None  # stays None on a cache hit
         
-        if file_type == "image":
+        loop = asyncio.get_running_loop()
+        
+        if extracted_text is not None:
+            logger.info(f"OCR cache hit for {file.filename}")
+        
+        elif file_type == "image":
             # Process image file using our OCR service
             try:
-                extracted_text = extract_text_from_image_bytes(file_content, language)
+                extracted_text, complete = await loop.run_in_executor(
+                    _EXTRACT_EXECUTOR, extract_text_from_image_path_checked, file_path, language, psm, model_quality
+                )
                 
             except Exception as e:
                 logger.error(f"Error processing image: {str(e)}")
@@ -204,16 +274,25 @@ async def extract_text(
         elif file_type == "pdf":
             # Process PDF file using our OCR service
             try:
-                page_texts = extract_text_from_pdf_bytes(file_content, language, dpi)
+                page_texts, complete = await loop.run_in_executor(
+                    _EXTRACT_EXECUTOR, extract_text_from_pdf_path_checked, file_path, language, dpi, psm, model_quality
+                )
                 extracted_text = "\n\n".join([f"--- Page {i+1} ---\n{text}" for i, text in enumerate(page_texts)])
                 
             except Exception as e:
                 logger.error(f"Error processing PDF: {str(e)}")
                 raise HTTPException(status_code=400, detail=f"Invalid PDF file: {str(e)}")
         
+        # Only cache clean results: a page error or the unpreprocessed image
+        # fallback may be transient and must not stick to this digest
+        if complete:
+            ocr_cache.put(cache_key, extracted_text)
+        elif complete is False:
+            logger.warning(f"Not caching partial OCR result for {file.filename}")
+        
         # Check if text was extracted
         if not extracted_text or extracted_text.strip() == "":
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=200,
                 content={
                     "text": "",
@@ -239,6 +318,9 @@ async def extract_text(
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    finally:
+        if file_path:
+            os.unlink(file_path)
 
 @app.post("/extract-text-batch")
 async def extract_text_batch(
@@ -253,53 +335,39 @@ async def extract_text_batch(
         language: OCR language (default: eng)
     
     Returns:
-        JSON with extracted text from all files
+        NDJSON stream with one result line per file, in completion order,
+        followed by a summary line with the file counts
     """
     try:
         if not files:
             raise HTTPException(status_code=400, detail="No files provided")
         
-        if len(files) > 10:  # Limit batch size
-            raise HTTPException(status_code=400, detail="Maximum 10 files allowed per batch")
+        if len(files) > BATCH_SIZE_LIMIT:  # Limit batch size
+            raise HTTPException(status_code=400, detail=f"Maximum {BATCH_SIZE_LIMIT} files allowed per batch")
         
-        results = []
+        # Spool every upload before streaming; the UploadFile handles are not
+        # guaranteed to stay open once the endpoint has returned its response
+        spooled = await asyncio.gather(*(spool_batch_file(file) for file in files), return_exceptions=True)
+        tasks = [
+            asyncio.create_task(process_batch_file(file.filename, entry, language))
+            for file, entry in zip(files, spooled)
+        ]
         
-        for file in files:
-            try:
-                # Process each file individually
-                file_content = await file.read()
-                file_type = validate_file_type(file.filename)
-                
-                if file_type == "image":
-                    text = extract_text_from_image_bytes(file_content, language)
-                elif file_type == "pdf":
-                    page_texts = extract_text_from_pdf_bytes(file_content, language)
-                    text = "\n\n".join([f"--- Page {i+1} ---\n{page_text}" for i, page_text in enumerate(page_texts)])
-                
-                results.append({
-                    "filename": file.filename,
-                    "file_type": file_type,
-                    "text": text,
-                    "status": "success",
-                    "text_length": len(text)
-                })
-                
-            except Exception as e:
-                logger.error(f"Error processing {file.filename}: {str(e)}")
-                results.append({
-                    "filename": file.filename,
-                    "file_type": "unknown",
-                    "text": "",
-                    "status": "error",
-                    "error": str(e)
-                })
+        async def stream_results():
+            successful = 0
+            for next_result in asyncio.as_completed(tasks):
+                result = await next_result
+                if result["status"] == "success":
+                    successful += 1
+                yield orjson.dumps(result) + b"\n"
+            
+            yield orjson.dumps({
+                "total_files": len(files),
+                "successful": successful,
+                "failed": len(files) - successful
+            }) + b"\n"
         
-        return {
-            "results": results,
-            "total_files": len(files),
-            "successful": len([r for r in results if r["status"] == "success"]),
-            "failed": len([r for r in results if r["status"] == "error"])
-        }
+        return StreamingResponse(stream_results(), media_type="application/x-ndjson")
         
     except Exception as e:
         logger.error(f"Batch processing error: {str(e)}")
@@ -0,0 +1,60 @@
+# app/services/cache.py
+"""
+OCR result cache keyed by the BLAKE3 digest of the uploaded file:
+a small in-process LRU in front of a persistent diskcache store
+"""
+from collections import OrderedDict
+from typing import Optional
+import logging
+import os
+import tempfile
+import threading
+
+import diskcache
+
+from .ocr import PREPROCESS_VERSION
+
+logger = logging.getLogger(__name__)
+
+MEMORY_CACHE_SIZE = 512
+CACHE_DIR = os.getenv("OCR_CACHE_DIR", os.path.join(tempfile.gettempdir(), "tammat-ocr-cache"))
+
+_memory: "OrderedDict[str, str]" = OrderedDict()
+_memory_lock = threading.Lock()
+_disk = diskcache.Cache(CACHE_DIR)
+
+def make_key(digest: str, lang: str, dpi: int, psm: int, model_quality: str) -> str:
+    """Cache key for a file digest and the OCR settings that affect its text"""
+    return f"{digest}:{lang}:{dpi}:{psm}:{model_quality}:v{PREPROCESS_VERSION}"
+
+def get(key: str) -> Optional[str]:
+    """Return the cached text for `key`, or None on a miss"""
+    with _memory_lock:
+        if key in _memory:
+            _memory.move_to_end(key)
+            return _memory[key]
+    
+    try:
+        text = _disk.get(key)
+    except Exception as e:
+        logger.warning(f"OCR cache read failed: {e}")
+        return None
+    
+    if text is not None:
+        _remember(key, text)
+    return text
+
+def put(key: str, text: str) -> None:
+    """Store extracted text under `key` in memory and on disk"""
+    _remember(key, text)
+    try:
+        _disk.set(key, text)
+    except Exception as e:
+        logger.warning(f"OCR cache write failed: {e}")
+
+def _remember(key: str, text: str) -> None:
+    with _memory_lock:
+        _memory[key] = text
+        _memory.move_to_end(key)
+        if len(_memory) > MEMORY_CACHE_SIZE:
+            _memory.popitem(last=False)
@@ -0,0 +1,61 @@
+# app/services/gpu_ocr.py
+"""
+Optional GPU OCR backend using docTR on CUDA.
+Only active when torch + python-doctr are installed (requirements-gpu.txt)
+and a CUDA device is visible; otherwise the Tesseract pipeline is used.
+"""
+from typing import List
+from PIL import Image
+import logging
+import os
+import threading
+
+import numpy as np
+
+try:
+    import torch
+    from doctr.models import ocr_predictor
+except ImportError:  # CPU-only image: Tesseract handles everything
+    torch = None
+
+logger = logging.getLogger(__name__)
+
+# docTR's pretrained crnn_vgg16_bn uses a French-oriented vocab without
+# ä/ö/ü/ß/ñ/á/í/ó, so German and Spanish stay on Tesseract
+GPU_LANGUAGES = {"eng", "fra"}
+
+# Pages per forward pass; bounds GPU memory on long scans
+GPU_BATCH_PAGES = int(os.getenv("GPU_BATCH_PAGES", "8"))
+
+_MODEL = None
+_MODEL_LOCK = threading.Lock()
+
+def gpu_available() -> bool:
+    """True when the docTR backend can run on a CUDA device"""
+    return torch is not None and torch.cuda.is_available()
+
+def supports_language(lang: str) -> bool:
+    """True when pages in `lang` should be routed to the GPU backend"""
+    return lang in GPU_LANGUAGES and gpu_available()
+
+def _get_model():
+    global _MODEL
+    with _MODEL_LOCK:
+        if _MODEL is None:
+            logger.info("Loading docTR OCR model on CUDA (fp16)")
+            _MODEL = ocr_predictor(pretrained=True).cuda().half()
+    return _MODEL
+
+def extract_text_gpu(pil_imgs: List[Image.Image]) -> List[str]:
+    """
+    Run detection + recognition on the pages as one batched forward pass
+    -> list of page texts, in input order. Callers keep batches to
+    GPU_BATCH_PAGES pages.
+    """
+    model = _get_model()
+    pages = [np.asarray(img.convert("RGB")) for img in pil_imgs]
+    
+    with torch.inference_mode():
+        result = model(pages)
+    
+    return [page.render().strip() for page in result.pages]
@@ -1,34 +1,264 @@
 # app/services/ocr.py
-from typing import List
-from PIL import Image, ImageOps, ImageFilter, ImageEnhance
+import os
+
+# Tesseract's OpenMP threads compete with our page-level parallelism:
+# run one thread per tesseract process and parallelise across pages instead.
+# libgomp reads this once when it is loaded, so it must be set before the
+# tesserocr import below (the Dockerfile also sets it for the whole image).
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import repeat
+from typing import Dict, List, Optional, Tuple, Union
+from PIL import Image
+import cv2
+import numpy as np
 import pytesseract
-from pdf2image import convert_from_bytes
+import fitz  # PyMuPDF
+import atexit
 import io
 import logging
+import multiprocessing
+import queue
+import tempfile
+import threading
+
+try:
+    import re2 as re  # DFA-based, single linear scan
+except ImportError:
+    import re
+
+try:
+    import tesserocr
+except ImportError:  # no libtesseract headers (e.g. Windows dev setups): shell out via pytesseract
+    tesserocr = None
 
 logger = logging.getLogger(__name__)
 
-def preprocess_image_for_ocr(pil_img: Image.Image) -> Image.Image:
+# PSM 6 (single uniform block of text) skips Tesseract's layout analysis;
+# callers can ask for PSM 3 (full auto) for multi-column documents
+DEFAULT_PSM = 6
+
+# Tesseract model sets: int8 tessdata_fast (default, runs the vectorised
+# IntSimdMatrix kernels) or float tessdata_best (slower, slightly more accurate).
+# An unset directory falls back to Tesseract's own TESSDATA_PREFIX.
+TESSDATA_DIRS = {
+    "fast": os.getenv("TESSDATA_FAST_DIR"),
+    "best": os.getenv("TESSDATA_BEST_DIR"),
+}
+DEFAULT_MODEL_QUALITY = "fast"
+
+def _tesseract_config(psm: int, quality: str) -> str:
+    """OEM 1 (LSTM only); let Tesseract pick the widest SIMD dot product"""
+    config = f"--oem 1 --psm {psm} -c dotproduct=auto"
+    if TESSDATA_DIRS[quality]:
+        config += f' --tessdata-dir "{TESSDATA_DIRS[quality]}"'
+    return config
+
+# Bump whenever preprocessing or Tesseract settings change the extracted text,
+# so cached OCR results from the previous pipeline are not served
+PREPROCESS_VERSION = 2
+
+# Runs of whitespace collapsed to a single space in image OCR output
+_WS = re.compile(r"\s+")
+
+def normalize_whitespace(text: str) -> str:
+    """Collapse runs of whitespace to single spaces and trim the ends"""
+    return _WS.sub(" ", text).strip()
+
+# Pages whose embedded text layer is shorter than this are treated as scans
+MIN_EMBEDDED_TEXT_CHARS = 20
+
+# A text layer alone doesn't make a page native: scans often carry a digital
+# overlay (fax header, Bates number, signature stamp). Pages mostly covered by
+# images, or with almost no text per square inch, are OCR'd as well
+MAX_IMAGE_COVERAGE = 0.5
+MIN_TEXT_CHARS_PER_SQ_INCH = 1.0
+
+def _looks_scanned(page: fitz.Page, text: str) -> bool:
+    """True when a page's embedded text can't be trusted to cover its content"""
+    if len(text) < MIN_EMBEDDED_TEXT_CHARS:
+        return True
+    
+    area = abs(page.rect)
+    if not area:
+        return False
+    if len(text) / (area / 72 ** 2) < MIN_TEXT_CHARS_PER_SQ_INCH:
+        return True
+    
+    covered = sum(abs(fitz.Rect(info["bbox"]) & page.rect) for info in page.get_image_info())
+    return covered / area >= MAX_IMAGE_COVERAGE
+
+# Scans are rasterised at DEFAULT_DPI; pages that OCR to fewer than
+# MIN_OCR_TEXT_CHARS are retried once at FALLBACK_DPI without the size cap
+DEFAULT_DPI = int(os.getenv("DEFAULT_DPI", "200"))
+FALLBACK_DPI = 300
+MIN_OCR_TEXT_CHARS = 10
+
+# Longest image side fed to Tesseract; larger inputs are downsampled (0 disables)
+OCR_MAX_DIM = int(os.getenv("OCR_MAX_DIM", "2200"))
+
+def _max_dim_for_dpi(dpi: int) -> int:
+    """Size cap for pages rendered at `dpi`, raised in proportion when the caller asks for more than DEFAULT_DPI"""
+    if not OCR_MAX_DIM or dpi <= DEFAULT_DPI:
+        return OCR_MAX_DIM
+    return OCR_MAX_DIM * dpi // DEFAULT_DPI
+
+# Worker processes for page-level OCR; started lazily on first submit.
+# "spawn" rather than fork: the parent is already multi-threaded (batch
+# executor, event loop), and a forked child would inherit the engine pool
+# below mid-use, with engines checked out or _API_LOCK held, and block forever
+_PAGE_WORKERS = os.cpu_count() or 1
+_PAGE_EXECUTOR = ProcessPoolExecutor(
+    max_workers=_PAGE_WORKERS,
+    mp_context=multiprocessing.get_context("spawn")
+)
+
+# Persistent tesserocr engines, pooled per (language, model set) so traineddata
+# is loaded once per engine instead of on every pytesseract subprocess.
+# Each page worker process ends up owning a single engine per language.
+THREAD_COUNT = int(os.getenv("THREAD_COUNT", "4"))
+_API_POOLS: Dict[Tuple[str, str], queue.Queue] = {}
+_API_COUNTS: Dict[Tuple[str, str], int] = {}
+_ALL_APIS = []
+_API_LOCK = threading.Lock()
+
+def _create_api(lang: str, quality: str):
+    kwargs = {"path": TESSDATA_DIRS[quality]} if TESSDATA_DIRS[quality] else {}
+    api = tesserocr.PyTessBaseAPI(lang=lang, oem=tesserocr.OEM.LSTM_ONLY, psm=tesserocr.PSM.AUTO, **kwargs)
+    api.SetVariable("dotproduct", "auto")
+    with _API_LOCK:
+        _ALL_APIS.append(api)
+    return api
+
+@contextmanager
+def api_ctx(lang: str, quality: str = DEFAULT_MODEL_QUALITY):
+    """Check out a Tesseract engine for `lang`; at most THREAD_COUNT exist per language and model set"""
+    key = (lang, quality)
+    with _API_LOCK:
+        pool = _API_POOLS.setdefault(key, queue.Queue())
+        create = pool.empty() and _API_COUNTS.get(key, 0) < THREAD_COUNT
+        if create:
+            _API_COUNTS[key] = _API_COUNTS.get(key, 0) + 1
+    
+    if create:
+        try:
+            api = _create_api(lang, quality)
+        except Exception:
+            with _API_LOCK:
+                _API_COUNTS[key] -= 1
+            raise
+    else:
+        api = pool.get()
+    
+    try:
+        yield api
+    finally:
+        pool.put(api)
+
+@atexit.register
+def _end_apis():
+    with _API_LOCK:
+        for api in _ALL_APIS:
+            api.End()
+        _ALL_APIS.clear()
+
+def _set_image(api, img: Union[np.ndarray, Image.Image]) -> None:
+    if isinstance(img, np.ndarray):
+        # 8-bit grayscale from preprocess_image_for_ocr
+        height, width = img.shape
+        api.SetImageBytes(img.tobytes(), width, height, 1, width)
+    else:
+        api.SetImage(img)
+
+def _image_to_string(img: Union[np.ndarray, Image.Image], lang: str, psm: int, quality: str) -> str:
+    """Run OCR on a preprocessed ndarray or PIL image"""
+    if tesserocr is None:
+        return pytesseract.image_to_string(img, lang=lang, config=_tesseract_config(psm, quality))
+    
+    with api_ctx(lang, quality) as api:
+        api.SetPageSegMode(psm)
+        _set_image(api, img)
+        return api.GetUTF8Text()
+
+# OSD results below this confidence are ignored; scanned pages with little
+# text (covers, separators, logos) otherwise produce confident-looking
+# wrong angles. Up to OSD_MAX_PAGES scanned pages are tried per document.
+OSD_MIN_CONFIDENCE = 5.0
+OSD_MAX_PAGES = 3
+
+def _detect_rotation(img: Image.Image, lang: str, quality: str) -> Optional[int]:
+    """
+    Orientation detection (OSD) on one page -> clockwise rotation in degrees
+    (0/90/180/270) that makes it upright; None when detection fails or its
+    confidence is below OSD_MIN_CONFIDENCE
     """
-    Basic preprocessing without OpenCV:
+    try:
+        proc = preprocess_image_for_ocr(img)
+        if tesserocr is None:
+            config = f'--tessdata-dir "{TESSDATA_DIRS[quality]}"' if TESSDATA_DIRS[quality] else ""
+            osd = pytesseract.image_to_osd(proc, config=config, output_type=pytesseract.Output.DICT)
+            rotation, confidence = int(osd["rotate"]) % 360, float(osd["orientation_conf"])
+        else:
+            with api_ctx(lang, quality) as api:
+                api.SetPageSegMode(tesserocr.PSM.OSD_ONLY)
+                _set_image(api, proc)
+                osd = api.DetectOrientationScript()
+            if not osd:
+                return None
+            # orient_deg is how far the page is turned clockwise; undo it
+            rotation, confidence = (360 - osd["orient_deg"]) % 360, osd["orient_conf"]
+        
+        if confidence < OSD_MIN_CONFIDENCE:
+            logger.info(f"Ignoring low-confidence orientation ({rotation} degrees, confidence {confidence:.1f})")
+            return None
+        return rotation
+        
+    except Exception as e:
+        logger.warning(f"Orientation detection failed: {e}")
+        return None
+
+def _rotate_upright(img: Image.Image, rotation: int) -> Image.Image:
+    # PIL rotates counter-clockwise; right angles are plain transposes
+    return img.rotate(-rotation, expand=True) if rotation else img
+
+# 1.5x contrast stretch as a lookup table. Clipped, not convertScaleAbs:
+# that takes |1.5x - 64| and folds the darkest pixels back up towards grey
+_CONTRAST_LUT = np.clip(1.5 * np.arange(256) - 64, 0, 255).astype(np.uint8)
+
+def preprocess_image_for_ocr(pil_img: Image.Image, max_dim: int = OCR_MAX_DIM) -> Union[np.ndarray, Image.Image]:
+    """
+    Preprocessing on a single ndarray with OpenCV:
       - convert to grayscale
+      - downsample so the longest side is at most `max_dim` (0 disables)
       - enhance contrast
-      - apply filters for better OCR
+      - apply slight blur to reduce noise
+    Returns a uint8 grayscale ndarray that pytesseract accepts directly.
     """
     try:
-        # Ensure RGB
-        if pil_img.mode != "RGB":
-            pil_img = pil_img.convert("RGB")
+        # Convert to grayscale in a single pass from whatever the source mode is
+        # (rendered PDF pages already arrive as L)
+        if pil_img.mode != "L":
+            pil_img = pil_img.convert("L")
         
-        # Convert to grayscale
-        gray = pil_img.convert("L")
+        # Take the raw L8 buffer once (no __array_interface__ round trip);
+        # every later step stays in numpy
+        width, height = pil_img.size
+        gray = np.frombuffer(pil_img.tobytes(), dtype=np.uint8).reshape(height, width)
         
-        # Enhance contrast
-        enhancer = ImageEnhance.Contrast(gray)
-        enhanced = enhancer.enhance(1.5)
+        # Extra pixels beyond Tesseract's preferred x-height only cost time
+        height, width = gray.shape
+        longest = max(height, width)
+        if max_dim and longest > max_dim:
+            size = (width * max_dim // longest, height * max_dim // longest)
+            gray = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+        
+        # Enhance contrast (~1.5x stretch around mid-grey, saturating at 0/255)
+        enhanced = cv2.LUT(gray, _CONTRAST_LUT)
         
         # Apply slight blur to reduce noise
-        processed = enhanced.filter(ImageFilter.GaussianBlur(radius=0.5))
+        processed = cv2.GaussianBlur(enhanced, (3, 3), 0.5)
         
         return processed
         
@@ -36,76 +266,273 @@ def preprocess_image_for_ocr(pil_img: Image.Image) -> Image.Image:
         logger.warning(f"Image preprocessing failed: {e}, using original image")
         return pil_img
 
-def extract_text_from_image_bytes(image_bytes: bytes, lang: str = "eng") -> str:
+def _open_image(source: Union[str, bytes]) -> Image.Image:
+    """Open an image from a file path (read lazily by PIL) or in-memory bytes"""
+    if isinstance(source, bytes):
+        return Image.open(io.BytesIO(source))
+    return Image.open(source)
+
+def extract_text_from_image_bytes(image_bytes: bytes, lang: str = "eng", psm: int = DEFAULT_PSM,
+                                  model_quality: str = DEFAULT_MODEL_QUALITY) -> str:
     """
     Convert bytes -> PIL -> preprocess -> pytesseract -> return text
     """
+    return _extract_text_from_image(image_bytes, lang, psm, model_quality)[0]
+
+def extract_text_from_image_path(image_path: str, lang: str = "eng", psm: int = DEFAULT_PSM,
+                                 model_quality: str = DEFAULT_MODEL_QUALITY) -> str:
+    """
+    Same as extract_text_from_image_bytes, reading the image from disk
+    """
+    return _extract_text_from_image(image_path, lang, psm, model_quality)[0]
+
+def extract_text_from_image_path_checked(image_path: str, lang: str = "eng", psm: int = DEFAULT_PSM,
+                                         model_quality: str = DEFAULT_MODEL_QUALITY) -> Tuple[str, bool]:
+    """
+    Same as extract_text_from_image_path, also returning False when the text
+    came from the unpreprocessed fallback rather than the normal pipeline
+    """
+    return _extract_text_from_image(image_path, lang, psm, model_quality)
+
+def _extract_text_from_image(source: Union[str, bytes], lang: str, psm: int, quality: str) -> Tuple[str, bool]:
     try:
-        img = Image.open(io.BytesIO(image_bytes))
+        img = _open_image(source)
         
         # Preprocess the image
         proc = preprocess_image_for_ocr(img)
         
-        # Pytesseract config: OEM 3 (default LSTM), PSM 3 (auto)
-        config = "--oem 3 --psm 3"
-        text = pytesseract.image_to_string(proc, lang=lang, config=config)
-        
         # Clean up extracted text
-        text = text.strip()
-        text = ' '.join(text.split())  # Remove extra whitespace
-        
-        return text
+        return normalize_whitespace(_image_to_string(proc, lang, psm, quality)), True
         
     except Exception as e:
         logger.error(f"Cannot process image: {e}")
         # Fallback to original image without preprocessing
         try:
-            img = Image.open(io.BytesIO(image_bytes))
+            img = _open_image(source)
             if img.mode != 'RGB':
                 img = img.convert('RGB')
             
-            config = "--oem 3 --psm 3"
-            text = pytesseract.image_to_string(img, lang=lang, config=config)
-            return text.strip()
+            text = pytesseract.image_to_string(img, lang=lang, config=_tesseract_config(psm, quality))
+            return text.strip(), False
         except Exception as fallback_error:
             logger.error(f"Fallback processing also failed: {fallback_error}")
             raise RuntimeError(f"Image processing failed: {e}")
 
-def extract_text_from_pdf_bytes(pdf_bytes: bytes, lang: str = "eng", dpi: int = 300) -> List[str]:
+def _page_result(text: Optional[str], page_no: int) -> str:
+    if text is None:
+        return f"[Page {page_no}: Processing error]"
+    if text:
+        return text
+    return f"[Page {page_no}: No text detected]"
+
+def _ocr_images(images: List[Image.Image], lang: str, psm: int, quality: str,
+                page_nos: List[int], max_dim: int) -> List[Optional[str]]:
     """
-    Convert PDF bytes -> images (pdf2image) -> run OCR on each page -> list of page texts
-    Requires poppler (pdftoppm) installed in system (Docker will install).
+    Preprocess + OCR a run of rendered PDF pages.
+    Returns the stripped text per page, or None for pages that failed.
+    With tesserocr the pages go through one checked-out engine, otherwise
+    through a single tesseract invocation, so the model loads once per run.
+    """
+    if tesserocr is None:
+        return _ocr_images_cli(images, lang, psm, quality, page_nos, max_dim)
+    
+    texts = []
+    with api_ctx(lang, quality) as api:
+        api.SetPageSegMode(psm)
+        for img, page_no in zip(images, page_nos):
+            try:
+                _set_image(api, preprocess_image_for_ocr(img, max_dim))
+                texts.append(api.GetUTF8Text().strip())
+            except Exception as e:
+                logger.error(f"Error processing page {page_no}: {e}")
+                texts.append(None)
+    return texts
+
+def _ocr_images_cli(images: List[Image.Image], lang: str, psm: int, quality: str,
+                    page_nos: List[int], max_dim: int) -> List[Optional[str]]:
+    """
+    pytesseract fallback for _ocr_images: the pages are written as one
+    multipage TIFF and OCR'd by a single tesseract run, which separates
+    pages with a form feed.
     """
     try:
-        images = convert_from_bytes(pdf_bytes, dpi=dpi)
-        logger.info(f"PDF converted to {len(images)} images")
+        pages = []
+        for img in images:
+            proc = preprocess_image_for_ocr(img, max_dim)
+            pages.append(Image.fromarray(proc) if isinstance(proc, np.ndarray) else proc)
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tiff_path = os.path.join(tmp_dir, "pages.tif")
+            out_base = os.path.join(tmp_dir, "out")
+            pages[0].save(tiff_path, save_all=True, append_images=pages[1:])
+            pytesseract.run_tesseract(tiff_path, out_base, extension="txt", lang=lang, config=_tesseract_config(psm, quality))
+            with open(f"{out_base}.txt", encoding="utf-8") as f:
+                texts = f.read().split("\x0c")
+        
+        texts += [""] * (len(page_nos) - len(texts))
+        return [text.strip() for text in texts[:len(page_nos)]]
+        
+    except Exception as e:
+        logger.error(f"Error processing pages {page_nos[0]}-{page_nos[-1]}: {e}")
+        return [None] * len(page_nos)
+
+def _split_runs(items: list, parts: int) -> List[list]:
+    """Split `items` into at most `parts` contiguous, near-equal runs"""
+    size, extra = divmod(len(items), parts)
+    runs, start = [], 0
+    for i in range(min(parts, len(items))):
+        end = start + size + (1 if i < extra else 0)
+        runs.append(items[start:end])
+        start = end
+    return runs
+
+def _render_page(page: fitz.Page, dpi: int) -> Image.Image:
+    """Rasterise a PDF page straight to an 8-bit grayscale PIL image"""
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+    return Image.frombytes("L", (pix.width, pix.height), pix.samples)
+
+def _ocr_pdf_pages(pdf_path: str, indices: List[int], lang: str, dpi: int, psm: int, quality: str,
+                   rotation: int) -> List[Optional[str]]:
+    """
+    Render + OCR a run of PDF pages, turning them `rotation` degrees clockwise
+    first; runs inside a worker process.
+    The worker opens the PDF itself, so only the path and page indices cross
+    the process boundary instead of pickled page rasters.
+    Pages that come back near-empty are retried once at FALLBACK_DPI
+    without the size cap, since low DPI is not enough for small print.
+    """
+    page_nos = [i + 1 for i in indices]
+    try:
+        with fitz.open(pdf_path, filetype="pdf") as doc:
+            images = [_rotate_upright(_render_page(doc[i], dpi), rotation) for i in indices]
+            texts = _ocr_images(images, lang, psm, quality, page_nos, _max_dim_for_dpi(dpi))
+            
+            retry = [k for k, text in enumerate(texts) if text is not None and len(text) < MIN_OCR_TEXT_CHARS]
+            if retry and dpi < FALLBACK_DPI:
+                logger.info(f"Retrying {len(retry)} pages at {FALLBACK_DPI} DPI")
+                images = [_rotate_upright(_render_page(doc[indices[k]], FALLBACK_DPI), rotation) for k in retry]
+                retried = _ocr_images(images, lang, psm, quality, [page_nos[k] for k in retry], 0)
+                for k, text in zip(retry, retried):
+                    if text is not None and len(text) > len(texts[k]):
+                        texts[k] = text
+        
+        return texts
+        
+    except Exception as e:
+        logger.error(f"Error processing pages {page_nos[0]}-{page_nos[-1]}: {e}")
+        return [None] * len(indices)
+
+def _ocr_scanned_pages(pdf_path: str, doc: fitz.Document, indices: List[int], lang: str, dpi: int, psm: int,
+                       quality: str) -> Dict[int, Optional[str]]:
+    """OCR the given page indices on the GPU if available, else across the worker pool"""
+    # Scans come off the same feeder: detect orientation once per document
+    # rather than letting every page pay for it, taking the first scanned
+    # page that gives a confident answer and assuming upright otherwise
+    rotation = 0
+    for i in indices[:OSD_MAX_PAGES]:
+        detected = _detect_rotation(_render_page(doc[i], dpi), lang, quality)
+        if detected is not None:
+            rotation = detected
+            break
+    if rotation:
+        logger.info(f"Rotating scanned pages {rotation} degrees clockwise")
+    
+    # Imported here, in the parent only: spawned page workers re-import this
+    # module and must not each pull in torch/docTR on GPU images
+    from . import gpu_ocr
+    
+    ocr_texts = {}
+    # docTR has no PSM or model-set equivalent: only default-settings requests
+    # go to the GPU, so a psm/model_quality override always gets Tesseract
+    if psm == DEFAULT_PSM and quality == DEFAULT_MODEL_QUALITY and gpu_ocr.supports_language(lang):
+        try:
+            for start in range(0, len(indices), gpu_ocr.GPU_BATCH_PAGES):
+                chunk = indices[start:start + gpu_ocr.GPU_BATCH_PAGES]
+                images = [_rotate_upright(_render_page(doc[i], dpi), rotation) for i in chunk]
+                ocr_texts.update(zip(chunk, gpu_ocr.extract_text_gpu(images)))
+        except Exception as e:
+            logger.warning(f"GPU OCR failed: {e}, falling back to Tesseract")
+            ocr_texts = {}
         
+        # Near-empty GPU pages get the Tesseract path, with its FALLBACK_DPI retry
+        ocr_texts = {i: text for i, text in ocr_texts.items() if len(text) >= MIN_OCR_TEXT_CHARS}
+        indices = [i for i in indices if i not in ocr_texts]
+        if not indices:
+            return ocr_texts
+    
+    # One contiguous run of pages per worker
+    runs = _split_runs(indices, _PAGE_WORKERS)
+    results = _PAGE_EXECUTOR.map(
+        _ocr_pdf_pages, repeat(pdf_path), runs, repeat(lang), repeat(dpi), repeat(psm), repeat(quality), repeat(rotation)
+    )
+    ocr_texts.update((i, text) for run, texts in zip(runs, results) for i, text in zip(run, texts))
+    return ocr_texts
+
+def extract_text_from_pdf_bytes(pdf_bytes: bytes, lang: str = "eng", dpi: int = DEFAULT_DPI, psm: int = DEFAULT_PSM,
+                                model_quality: str = DEFAULT_MODEL_QUALITY) -> List[str]:
+    """
+    Open PDF bytes with PyMuPDF -> use the embedded text layer of each page ->
+    rasterise + OCR only the pages without a usable one (scans) -> list of page texts
+    The bytes are written to a temporary file so OCR workers can open it by path.
+    """
+    fd, pdf_path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf_bytes)
+        return extract_text_from_pdf_path(pdf_path, lang, dpi, psm, model_quality)
+    finally:
+        os.unlink(pdf_path)
+
+def extract_text_from_pdf_path(pdf_path: str, lang: str = "eng", dpi: int = DEFAULT_DPI, psm: int = DEFAULT_PSM,
+                               model_quality: str = DEFAULT_MODEL_QUALITY) -> List[str]:
+    """
+    Same as extract_text_from_pdf_bytes, letting PyMuPDF read the file from disk
+    """
+    return extract_text_from_pdf_path_checked(pdf_path, lang, dpi, psm, model_quality)[0]
+
+def extract_text_from_pdf_path_checked(pdf_path: str, lang: str = "eng", dpi: int = DEFAULT_DPI, psm: int = DEFAULT_PSM,
+                                       model_quality: str = DEFAULT_MODEL_QUALITY) -> Tuple[List[str], bool]:
+    """
+    Same as extract_text_from_pdf_path, also returning False when any page
+    failed and holds a "[Page N: Processing error]" placeholder
+    """
+    try:
+        doc = fitz.open(pdf_path, filetype="pdf")
     except Exception as e:
         logger.error(f"PDF conversion failed: {e}")
         raise RuntimeError(f"PDF conversion failed: {e}")
 
-    page_texts = []
-    for i, img in enumerate(images):
-        try:
-            logger.info(f"Processing PDF page {i + 1}/{len(images)}")
-            
-            # Preprocess each page
-            proc = preprocess_image_for_ocr(img)
-            
-            # Extract text
-            config = "--oem 3 --psm 3"
-            page_text = pytesseract.image_to_string(proc, lang=lang, config=config).strip()
-            
-            if page_text:
-                page_texts.append(page_text)
-            else:
-                page_texts.append(f"[Page {i + 1}: No text detected]")
+    with doc:
+        page_texts = []
+        scanned = []
+        complete = True
+        for i, page in enumerate(doc):
+            try:
+                text = page.get_text("text").strip()
+                if not _looks_scanned(page, text):
+                    page_texts.append(text)
+                    continue
                 
-        except Exception as e:
-            logger.error(f"Error processing page {i + 1}: {e}")
-            page_texts.append(f"[Page {i + 1}: Processing error]")
+                scanned.append(i)
+                page_texts.append(None)
+                
+            except Exception as e:
+                logger.error(f"Error processing page {i + 1}: {e}")
+                page_texts.append(f"[Page {i + 1}: Processing error]")
+                complete = False
+        
+        logger.info(f"PDF has {len(page_texts)} pages, {len(scanned)} need OCR")
+        if not scanned:
+            return page_texts, complete
+        
+        ocr_texts = _ocr_scanned_pages(pdf_path, doc, scanned, lang, dpi, psm, model_quality)
+    
+    for i, text in ocr_texts.items():
+        page_texts[i] = _page_result(text, i + 1)
+        if text is None:
+            complete = False
     
-    return page_texts
+    return page_texts, complete
 
 def extract_text_simple(image_bytes: bytes, lang: str = "eng") -> str:
     """
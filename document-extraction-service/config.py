@@ -3,6 +3,7 @@ Configuration file for Tammat Document Extraction Service
 """
 
 import os
+import tempfile
 from typing import List
 
 # API Configuration
@@ -27,6 +28,8 @@ if os.getenv("CORS_ORIGINS"):
 # Tesseract Configuration
 TESSERACT_CMD = os.getenv("TESSERACT_CMD", "tesseract")
 TESSERACT_LANGUAGES = os.getenv("TESSERACT_LANGUAGES", "eng,ara,urd,hin,fra,spa,rus,deu").split(",")
+TESSDATA_FAST_DIR = os.getenv("TESSDATA_FAST_DIR")  # int8 models, default model set
+TESSDATA_BEST_DIR = os.getenv("TESSDATA_BEST_DIR")  # float models, model_quality=best
 
 # File Processing Configuration
 MAX_FILE_SIZE = int(os.getenv("MAX_FILE_SIZE", "50")) * 1024 * 1024  # 50MB default
@@ -35,7 +38,8 @@ SUPPORTED_PDF_TYPES = {".pdf"}
 SUPPORTED_TYPES = SUPPORTED_IMAGE_TYPES | SUPPORTED_PDF_TYPES
 
 # OCR Configuration
-DEFAULT_DPI = int(os.getenv("DEFAULT_DPI", "300"))
+DEFAULT_DPI = int(os.getenv("DEFAULT_DPI", "200"))
+OCR_MAX_DIM = int(os.getenv("OCR_MAX_DIM", "2200"))  # longest image side fed to Tesseract, 0 disables
 DEFAULT_LANGUAGE = os.getenv("DEFAULT_LANGUAGE", "eng")
 BATCH_SIZE_LIMIT = int(os.getenv("BATCH_SIZE_LIMIT", "10"))
 
@@ -47,6 +51,7 @@ PROCESSING_TIMEOUT = int(os.getenv("PROCESSING_TIMEOUT", "300"))  # 5 minutes
 UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
 LOGS_DIR = os.getenv("LOGS_DIR", "logs")
 TEMP_DIR = os.getenv("TEMP_DIR", "temp")
+OCR_CACHE_DIR = os.getenv("OCR_CACHE_DIR", os.path.join(tempfile.gettempdir(), "tammat-ocr-cache"))
 
 # Security Configuration
 ENABLE_RATE_LIMITING = os.getenv("ENABLE_RATE_LIMITING", "false").lower() == "true"
@@ -81,12 +86,15 @@ def get_config_summary():
         },
         "tesseract": {
             "command": TESSERACT_CMD,
-            "languages": TESSERACT_LANGUAGES
+            "languages": TESSERACT_LANGUAGES,
+            "tessdata_fast_dir": TESSDATA_FAST_DIR,
+            "tessdata_best_dir": TESSDATA_BEST_DIR
         },
         "processing": {
             "max_file_size_mb": MAX_FILE_SIZE // (1024 * 1024),
             "supported_types": list(SUPPORTED_TYPES),
             "default_dpi": DEFAULT_DPI,
+            "ocr_max_dim": OCR_MAX_DIM,
             "default_language": DEFAULT_LANGUAGE,
             "batch_limit": BATCH_SIZE_LIMIT
         },